@@ -1,11 +1,20 @@
 import os
 import asyncio
+import base64
+import contextlib
+import hashlib
+import io
 import json
 import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import warnings
 from datetime import datetime
-from aiohttp import web, ClientSession, BasicAuth
+from aiohttp import web, ClientSession, ClientTimeout, BasicAuth, TCPConnector
 from pathlib import Path
+from types import MappingProxyType
 
 # Suppress SSL warnings for local network devices
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
@@ -45,6 +54,10 @@ SCREENSHOT_HEIGHT = int(os.environ.get('SCREENSHOT_HEIGHT', '1080'))
 SCREENSHOT_ZOOM = int(os.environ.get('SCREENSHOT_ZOOM', '100'))  # percentage: 100 = 100%, 150 = 150%, etc.
 SCREENSHOT_WAIT = float(os.environ.get('SCREENSHOT_WAIT', '0.0'))  # seconds to wait after network idle (0 = no additional wait)
 SCREENSHOT_SKIP_NAVIGATION = os.environ.get('SCREENSHOT_SKIP_NAVIGATION', 'false').lower() in ('1','true','yes')  # Skip page reload, just take new screenshot
+SCREENSHOT_WAIT_UNTIL = os.environ.get('SCREENSHOT_WAIT_UNTIL') or 'networkidle2'  # page.goto() lifecycle event: load, domcontentloaded, networkidle0, networkidle2
+SCREENSHOT_WAIT_SELECTOR = os.environ.get('SCREENSHOT_WAIT_SELECTOR') or None  # optional CSS selector to wait for (until visible) after navigation
+SCREENSHOT_BLOCK_RESOURCES = frozenset(t.strip().lower() for t in (os.environ.get('SCREENSHOT_BLOCK_RESOURCES') or '').split(',') if t.strip())  # resource types not to load, e.g. media,font,image
+SCREENSHOT_QUALITY = int(os.environ.get('SCREENSHOT_QUALITY', '90'))  # JPEG quality of rendered screenshots (1-100)
 
 # Logging
 DEBUG_LOGGING = os.environ.get('DEBUG_LOGGING', 'false').lower() in ('1','true','yes')
@@ -59,6 +72,11 @@ TV_PORT = int(os.environ.get('TV_PORT', '8001'))
 TV_MATTE = os.environ.get('TV_MATTE') or None
 TV_SHOW_AFTER_UPLOAD = os.environ.get('TV_SHOW_AFTER_UPLOAD', 'true').lower() in ('1','true','yes')
 TV_UPLOAD_TIMEOUT = int(os.environ.get('TV_UPLOAD_TIMEOUT', '60'))  # seconds (default: 60s)
+TV_RESIZE = os.environ.get('TV_RESIZE', 'true').lower() in ('1','true','yes')  # Re-encode large art before upload
+TV_JPEG_QUALITY = int(os.environ.get('TV_JPEG_QUALITY', '90'))  # JPEG quality of re-encoded art (1-100)
+# Art larger than this is downscaled to the Frame's 4K panel and re-encoded before upload
+TV_MAX_RESOLUTION = (3840, 2160)
+TV_REENCODE_THRESHOLD = 1024 * 1024  # bytes
 TARGET_URL = os.environ.get('TARGET_URL') or ''
 # Target URL auth settings (supports multiple auth types)
 # TARGET_AUTH_TYPE: none|bearer|basic|headers
@@ -69,9 +87,34 @@ TARGET_TOKEN_PREFIX = os.environ.get('TARGET_TOKEN_PREFIX', 'Bearer')
 TARGET_USERNAME = os.environ.get('TARGET_USERNAME')
 TARGET_PASSWORD = os.environ.get('TARGET_PASSWORD')
 TARGET_HEADERS = os.environ.get('TARGET_HEADERS')  # optional JSON map of headers
+TARGET_ALWAYS_RENDER = os.environ.get('TARGET_ALWAYS_RENDER', 'false').lower() in ('1','true','yes')  # Target is a web page; render it without probing
+
+# Build request headers/auth once so the target URL can be Home Assistant (token
+# header), DakBoard (basic auth), or any other URL requiring custom headers.
+_headers = {}
+_TARGET_AUTH = None
+if TARGET_HEADERS:
+    try:
+        _parsed_headers = json.loads(TARGET_HEADERS)
+        if isinstance(_parsed_headers, dict):
+            _headers.update(_parsed_headers)
+    except Exception:
+        logger.warning('Failed to parse TARGET_HEADERS; expecting JSON map')
+
+if TARGET_AUTH_TYPE == 'bearer' and TARGET_TOKEN:
+    _headers[TARGET_TOKEN_HEADER] = f"{TARGET_TOKEN_PREFIX} {TARGET_TOKEN}"
+elif TARGET_AUTH_TYPE == 'basic' and TARGET_USERNAME and TARGET_PASSWORD:
+    _TARGET_AUTH = BasicAuth(TARGET_USERNAME, TARGET_PASSWORD)
+# Read-only: shared by every fetch and render for the life of the process
+_TARGET_HEADERS = MappingProxyType(_headers)
 
 # Always replace last art file (hard-coded path for persistence)
 TV_LAST_ART_FILE = '/data/last-art-id.txt'
+# Content hash of the last image successfully uploaded to the TV
+TV_LAST_HASH_FILE = '/data/last-art-hash.txt'
+
+# HTTP validators (ETag / Last-Modified) from the last image fetched from the target
+TARGET_CACHE_FILE = '/data/provider-cache.json'
 
 # MQTT configuration (optional Home Assistant integration)
 MQTT_ENABLED = os.environ.get('MQTT_ENABLED', 'false').lower() in ('1','true','yes')
@@ -91,6 +134,7 @@ if DEBUG_LOGGING:
     logger.info(f'  Screenshot: {SCREENSHOT_WIDTH}x{SCREENSHOT_HEIGHT} @ {SCREENSHOT_ZOOM}% zoom')
     logger.info(f'  Screenshot Wait: {SCREENSHOT_WAIT}s (after network idle)')
     logger.info(f'  Screenshot Skip Navigation: {SCREENSHOT_SKIP_NAVIGATION}')
+    logger.info(f'  Screenshot Quality: {SCREENSHOT_QUALITY}')
     logger.info(f'  Art Path: {ART_PATH}')
     logger.info(f'  TV Upload: {"ENABLED" if TV_IP else "DISABLED"}')
     if TV_IP:
@@ -105,8 +149,83 @@ if DEBUG_LOGGING:
         logger.info(f'  MQTT Topic Base: {MQTT_TOPIC_BASE}')
     logger.info('='*60)
 
-async def upload_image_to_tv_async(host: str, port: int, image_path: str, matte: str = None, show: bool = True):
-    """Upload image to Samsung TV using sync library in executor."""
+# Persistent art-mode connection to the TV, reused across uploads. Uploads run in
+# executor threads, so access is serialized with a thread lock.
+_tv_client = None
+_tv_lock = threading.Lock()
+# Uploads get their own thread so one hung on the TV can't tie up the default
+# executor used for file I/O
+_tv_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tv-upload')
+# Optional keyword arguments the installed samsungtvws accepts. Both start as
+# True and flip to False the first time the call raises TypeError, so older
+# library versions fall back directly instead of failing first on every upload.
+_tv_signatures = {'upload_matte': True, 'select_show': True}
+# TV hosts already confirmed to support art mode (survives reconnects)
+_tv_supported_cache: dict[str, bool] = {}
+# Content ID of the art last selected on the TV, mirrored in TV_LAST_ART_FILE
+try:
+    with open(TV_LAST_ART_FILE, 'r') as _f:
+        _last_art_id = _f.read().strip() or None
+except Exception:
+    _last_art_id = None
+# Content hash of the art behind _last_art_id, as recorded by the upload
+# thread itself (guarded by _tv_lock)
+_tv_art_hash = None
+
+
+def _close_tv_client():
+    """Close and forget the persistent TV connection."""
+    global _tv_client
+    tv, _tv_client = _tv_client, None
+    if tv is not None:
+        with contextlib.suppress(Exception):
+            tv.close()
+            logger.debug('[TV UPLOAD] TV connection closed')
+
+
+def _image_type(data: bytes) -> str:
+    """Return the art's format ('PNG' or 'JPG') from its leading bytes."""
+    return 'PNG' if data.startswith(b'\x89PNG\r\n\x1a\n') else 'JPG'
+
+
+def _write_text_atomic(path: str, text: str):
+    """Replace a small state file in one step so a crash can't leave it empty."""
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _shrink_for_tv(data: bytes):
+    """Downscale and re-encode art as a TV-sized JPEG.
+
+    Returns the new bytes, or None if Pillow is unavailable, the image can't be
+    decoded, or re-encoding wouldn't make it smaller.
+    """
+    try:
+        from PIL import Image
+    except Exception as e:
+        logger.debug(f'[TV UPLOAD] Pillow not available, uploading art as-is: {e}')
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.thumbnail(TV_MAX_RESOLUTION)
+            buf = io.BytesIO()
+            img.convert('RGB').save(buf, 'JPEG', quality=TV_JPEG_QUALITY, optimize=True)
+    except Exception as e:
+        logger.debug(f'[TV UPLOAD] Could not re-encode art, uploading as-is: {e}')
+        return None
+    shrunk = buf.getvalue()
+    return shrunk if len(shrunk) < len(data) else None
+
+
+async def upload_image_to_tv_async(host: str, port: int, image_path: str, matte: str = None, show: bool = True, image_data: bytes | None = None, digest: str | None = None):
+    """Upload image to Samsung TV using sync library in executor.
+
+    If image_data is given it is uploaded directly instead of reading
+    image_path. The file type is detected from the image bytes. If digest is
+    given and that art is already selected on the TV, nothing is uploaded.
+    """
     logger.debug(f'[TV UPLOAD] Starting upload to {host}:{port}')
     
     try:
@@ -115,134 +234,243 @@ async def upload_image_to_tv_async(host: str, port: int, image_path: str, matte:
         logger.error(f'[TV UPLOAD] ERROR: samsungtvws library not available: {e}')
         return None
 
-    def _sync_upload():
-        """Synchronous upload function to run in executor."""
+    # Set when this call times out or is cancelled. The executor thread can't
+    # be interrupted, so it checks this before each step that hasn't touched
+    # the TV yet and gives up instead of uploading art nobody is waiting for.
+    # Once an upload has started it runs to completion so the new ID is
+    # recorded and the old art cleaned up.
+    stop_evt = threading.Event()
+
+    def _connect():
+        """Open a new art-mode connection to the TV, or None if art mode is unsupported."""
         token_file = '/data/tv-token.txt'
-        tv = None
-        # Create local copy of show parameter so we can modify it
-        local_show = show
+        logger.debug(f'[TV UPLOAD] Connecting to TV (token file: {token_file})')
+        tv = SamsungTVArt(host=host, port=port, token_file=token_file)
         try:
-            logger.debug(f'[TV UPLOAD] Connecting to TV (token file: {token_file})')
-            tv = SamsungTVArt(host=host, port=port, token_file=token_file)
             tv.open()
-
-            supported = tv.supported()
-            if not supported:
-                logger.error('[TV UPLOAD] ERROR: TV does not support art mode via this API')
+            # Art-mode support is a property of the TV, so only ask once per host
+            supported = _tv_supported_cache.get(host)
+            if supported is None:
+                supported = tv.supported()
+                if supported:
+                    _tv_supported_cache[host] = True
+            else:
+                logger.debug('[TV UPLOAD] Art mode support already confirmed for this TV')
+        except Exception:
+            try:
                 tv.close()
-                return None
+            except Exception:
+                pass
+            raise
+        if not supported:
+            logger.error('[TV UPLOAD] ERROR: TV does not support art mode via this API')
+            tv.close()
+            return None
+        return tv
 
+    def _upload_with(tv):
+        """Upload, select and clean up art over an open TV connection."""
+        global _last_art_id, _tv_art_hash
+        # Create local copy of show parameter so we can modify it
+        local_show = show
+
+        if image_data is not None:
+            data = image_data
+        else:
             # read image bytes
             logger.debug(f'[TV UPLOAD] Reading image from {image_path}')
             with open(image_path, 'rb') as f:
                 data = f.read()
-            logger.debug(f'[TV UPLOAD] Image size: {len(data)} bytes')
+        logger.debug(f'[TV UPLOAD] Image size: {len(data)} bytes')
+
+        # ART_PATH is always named .jpg, but image targets may serve PNG
+        file_type = _image_type(data)
+
+        # Large art (e.g. a full-resolution PNG from the target) costs upload
+        # time on every cycle; send a TV-sized JPEG instead
+        if TV_RESIZE and len(data) > TV_REENCODE_THRESHOLD:
+            shrunk = _shrink_for_tv(data)
+            if shrunk is not None:
+                logger.debug(f'[TV UPLOAD] Re-encoded art for upload: {len(data)} -> {len(shrunk)} bytes')
+                data = shrunk
+                file_type = 'JPG'
+        logger.debug(f'[TV UPLOAD] Uploading image (type={file_type}, matte={matte}, show={local_show})')
+        
+        # Get cached ID for cleanup after upload
+        last_id = _last_art_id
+        if last_id:
+            logger.debug(f'[TV UPLOAD] Found cached art ID: {last_id}')
 
-            file_type = os.path.splitext(image_path)[1][1:].upper() or 'JPEG'
-            logger.debug(f'[TV UPLOAD] Uploading image (type={file_type}, matte={matte}, show={local_show})')
-            
-            # Get cached ID for cleanup after upload
-            last_id = None
-            if os.path.exists(TV_LAST_ART_FILE):
-                try:
-                    with open(TV_LAST_ART_FILE, 'r') as lf:
-                        last_id = lf.read().strip() or None
-                    if last_id:
-                        logger.debug(f'[TV UPLOAD] Found cached art ID: {last_id}')
-                except Exception:
-                    pass
-
-            # Upload new art
-            logger.debug('[TV UPLOAD] Uploading new art entry')
-            content_id = None
+        if stop_evt.is_set():
+            logger.debug('[TV UPLOAD] Upload abandoned after timeout')
+            return None
+
+        # Upload new art
+        logger.debug('[TV UPLOAD] Uploading new art entry')
+        content_id = None
+        if matte and _tv_signatures['upload_matte']:
             try:
-                if matte:
-                    content_id = tv.upload(data, file_type=file_type.lower(), matte=matte)
-                else:
-                    content_id = tv.upload(data, file_type=file_type.lower())
+                content_id = tv.upload(data, file_type=file_type.lower(), matte=matte)
             except TypeError:
-                content_id = tv.upload(data, file_type=file_type.lower())
-
-            logger.debug(f'[TV UPLOAD] Upload returned id: {content_id}')
-            if content_id is not None:
-                # Check if TV is in art mode - if so, force show=True so image actually displays
-                try:
-                    art_mode_status = tv.get_artmode()
-                    logger.debug(f'[TV UPLOAD] TV art mode status: {art_mode_status} (type: {type(art_mode_status).__name__})')
-                    # If TV is in art mode, force show=True to make the image display
-                    # Check various possible return values: 'on', 'On', True, etc.
-                    if art_mode_status and str(art_mode_status).lower() in ('on', 'true', '1'):
-                        local_show = True
-                        logger.debug('[TV UPLOAD] TV is in art mode, forcing show=True')
-                except Exception as e:
-                    logger.debug(f'[TV UPLOAD] Could not check art mode status: {e}')
-                
-                logger.debug(f'[TV UPLOAD] Attempting to select image on TV (show={local_show})')
-                selection_successful = False
+                logger.debug('[TV UPLOAD] upload() does not accept matte; uploading without it from now on')
+                _tv_signatures['upload_matte'] = False
+        if not (matte and _tv_signatures['upload_matte']):
+            content_id = tv.upload(data, file_type=file_type.lower())
+
+        logger.debug(f'[TV UPLOAD] Upload returned id: {content_id}')
+        if content_id is not None:
+            # Check if TV is in art mode - if so, force show=True so image actually displays
+            try:
+                art_mode_status = tv.get_artmode()
+                logger.debug(f'[TV UPLOAD] TV art mode status: {art_mode_status} (type: {type(art_mode_status).__name__})')
+                # If TV is in art mode, force show=True to make the image display
+                # Check various possible return values: 'on', 'On', True, etc.
+                if art_mode_status and str(art_mode_status).lower() in ('on', 'true', '1'):
+                    local_show = True
+                    logger.debug('[TV UPLOAD] TV is in art mode, forcing show=True')
+            except Exception as e:
+                logger.debug(f'[TV UPLOAD] Could not check art mode status: {e}')
+            
+            logger.debug(f'[TV UPLOAD] Attempting to select image on TV (show={local_show})')
+            selection_successful = False
+            if _tv_signatures['select_show']:
                 try:
                     # Try to select with show parameter (controls whether image is displayed)
                     tv.select_image(content_id, show=local_show)
                     logger.debug(f'[TV UPLOAD] ✓ Selected uploaded image on TV (show={local_show})')
                     selection_successful = True
                 except TypeError:
-                    # If show parameter not supported, try without it
-                    try:
-                        tv.select_image(content_id)
-                        logger.debug('[TV UPLOAD] ✓ Selected uploaded image on TV (without show parameter)')
-                        selection_successful = True
-                    except Exception as e:
-                        logger.error(f'[TV UPLOAD] ERROR: Failed to select uploaded image: {e}')
+                    logger.debug('[TV UPLOAD] select_image() does not accept show; selecting without it from now on')
+                    _tv_signatures['select_show'] = False
+                except Exception as e:
+                    logger.error(f'[TV UPLOAD] ERROR: Failed to select uploaded image: {e}')
+            if not _tv_signatures['select_show']:
+                # If show parameter not supported, select without it
+                try:
+                    tv.select_image(content_id)
+                    logger.debug('[TV UPLOAD] ✓ Selected uploaded image on TV (without show parameter)')
+                    selection_successful = True
                 except Exception as e:
                     logger.error(f'[TV UPLOAD] ERROR: Failed to select uploaded image: {e}')
 
-                # Delete old art only after new art is successfully selected
-                if selection_successful and last_id and last_id != content_id:
-                    try:
-                        logger.debug(f'[TV UPLOAD] Deleting previous art entry: {last_id}')
-                        tv.delete(last_id)
-                        logger.debug('[TV UPLOAD] ✓ Previous art deleted')
-                    except Exception as e:
-                        logger.warning(f'[TV UPLOAD] Warning: Failed to delete previous art: {e}')
-
-            tv.close()
-            logger.debug('[TV UPLOAD] TV connection closed')
+            # Delete old art only after new art is successfully selected
+            if selection_successful and last_id and last_id != content_id:
+                try:
+                    logger.debug(f'[TV UPLOAD] Deleting previous art entry: {last_id}')
+                    tv.delete(last_id)
+                    logger.debug('[TV UPLOAD] ✓ Previous art deleted')
+                except Exception as e:
+                    logger.warning(f'[TV UPLOAD] Warning: Failed to delete previous art: {e}')
 
-            # Persist last art id for future replace attempts (only if selection was successful)
+        # Persist last art id for future replace attempts (only if selection was successful)
+        if content_id and selection_successful and str(content_id) != _last_art_id:
+            _last_art_id = str(content_id)
             try:
-                if content_id and selection_successful:
-                    with open(TV_LAST_ART_FILE, 'w') as lf:
-                        lf.write(str(content_id))
-                    logger.debug(f'[TV UPLOAD] ✓ Cached art ID {content_id} to {TV_LAST_ART_FILE}')
+                _write_text_atomic(TV_LAST_ART_FILE, _last_art_id)
+                logger.debug(f'[TV UPLOAD] ✓ Cached art ID {content_id} to {TV_LAST_ART_FILE}')
             except Exception as e:
                 logger.warning(f'[TV UPLOAD] Warning: Failed to cache art ID: {e}')
+        if content_id and selection_successful:
+            _tv_art_hash = digest
 
-            return content_id
-            
-        except Exception as e:
-            logger.error(f'[TV UPLOAD] ERROR: Exception during TV interaction: {e}')
+        return content_id
+
+    def _sync_upload():
+        """Synchronous upload function to run in executor."""
+        global _tv_client
+        with _tv_lock:
+            # A previous upload may have held the lock past our timeout
+            if stop_evt.is_set():
+                logger.debug('[TV UPLOAD] Upload abandoned after timeout')
+                return None
+            # An earlier attempt that outlived its timeout may already have
+            # finished this upload; sending it again would replace it with a copy
+            if digest and digest == _tv_art_hash and _last_art_id:
+                logger.debug('[TV UPLOAD] Art already selected on TV; skipping upload')
+                return _last_art_id
+            reused = _tv_client is not None
             try:
-                if tv:
-                    tv.close()
-            except Exception:
-                pass
-            return None
+                if _tv_client is None:
+                    _tv_client = _connect()
+                    if _tv_client is None:
+                        return None
+                else:
+                    logger.debug('[TV UPLOAD] Reusing open TV connection')
+                return _upload_with(_tv_client)
+            except Exception as e:
+                _close_tv_client()
+                if not reused:
+                    logger.error(f'[TV UPLOAD] ERROR: Exception during TV interaction: {e}')
+                    _tv_supported_cache.pop(host, None)
+                    return None
+                # The TV may have dropped an idle connection; reconnect once
+                logger.debug(f'[TV UPLOAD] Reused connection failed ({e}); reconnecting')
+            if stop_evt.is_set():
+                return None
+            try:
+                _tv_client = _connect()
+                if _tv_client is None:
+                    return None
+                return _upload_with(_tv_client)
+            except Exception as e:
+                logger.error(f'[TV UPLOAD] ERROR: Exception during TV interaction: {e}')
+                _close_tv_client()
+                # Failing on a fresh connection too; re-check support next time
+                _tv_supported_cache.pop(host, None)
+                return None
 
     # Run sync function in thread executor with timeout
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
     try:
         return await asyncio.wait_for(
-            loop.run_in_executor(None, _sync_upload),
+            loop.run_in_executor(_tv_executor, _sync_upload),
             timeout=TV_UPLOAD_TIMEOUT
         )
     except asyncio.TimeoutError:
         logger.info(f'[TV UPLOAD] ERROR: Upload timed out after {TV_UPLOAD_TIMEOUT}s')
         return None
-
+    finally:
+        # Also covers cancellation at shutdown; a no-op once the thread is done
+        stop_evt.set()
+
+
+# Chromium flags that keep the persistent headless browser lean: no GPU,
+# extensions or background services, and /tmp instead of a small /dev/shm
+LAUNCH_ARGS = [
+    '--disable-gpu',
+    '--disable-dev-shm-usage',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-sync',
+    '--disable-translate',
+    '--metrics-recording-only',
+    '--mute-audio',
+    '--no-first-run',
+    '--safebrowsing-disable-auto-update',
+    '--hide-scrollbars',
+    '--disable-features=TranslateUI',
+    '--renderer-process-limit=1',
+]
+
+# Page.captureScreenshot parameters: viewport only, so Chromium never lays out
+# or rasterizes content below the fold
+CAPTURE_PARAMS = {'format': 'jpeg', 'quality': SCREENSHOT_QUALITY, 'captureBeyondViewport': False}
 
 # Global browser and page instances for persistent rendering
 _browser = None
 _page = None
+_cdp = None  # DevTools session attached to _page, used for screenshots
+# Page settings already sent to _page, so unchanged ones aren't re-sent each render
+_page_viewport = None
+_page_headers = None
+_page_url = None  # URL last navigated to on _page
+_zoom_applied = None  # zoom set on the current document (navigation resets it)
 _page_lock = asyncio.Lock()
+# In-flight request-interception handlers; the loop only keeps weak references
+_filter_tasks = set()
+
+# Pooled HTTP session for target fetches, created in async_main
+_http_session = None
 
 # Status tracking for API
 _status_lock = asyncio.Lock()
@@ -255,21 +483,66 @@ _mqtt_client = None
 _mqtt_connected = False
 _mqtt_lock = asyncio.Lock()
 _main_loop = None  # Store main event loop for MQTT callbacks
+# Last state payload published during this connection, so a repeated
+# failure isn't sent again while the broker still retains it
+_mqtt_last_state = None
+
+# (content hash, bytes) of ART_PATH for /screenshot. The hash doubles as the
+# ETag; bytes are None for streamed art, which is served from disk. Replaced
+# as one tuple because writers run in worker threads.
+_art_cache = (None, None)
+
+# Art waiting for upload to the TV (at most one; newer art replaces it)
+_upload_queue = asyncio.Queue(maxsize=1)
+# Hash of the art currently on the TV
+_last_art_hash = None
+# Hash of the art the upload worker is sending right now, if any
+_inflight_art_hash = None
+# Set once TARGET_URL has served HTML (or up front via target_always_render);
+# later cycles render it without probing
+_target_is_html = TARGET_ALWAYS_RENDER
+
+def _on_browser_disconnected(browser):
+    """Forget a browser whose DevTools connection closed so the next render relaunches it."""
+    global _browser, _page, _cdp
+    if _browser is browser:
+        logger.debug('[BROWSER] Browser connection lost, will relaunch on next render')
+        _browser = None
+        _page = None
+        _cdp = None
+
+
+def _on_frame_navigated(frame):
+    """Forget the applied zoom when the main frame loads a new document."""
+    global _zoom_applied
+    if frame.parentFrame is None:
+        _zoom_applied = None
+
+
+async def _filter_request(req):
+    """Abort subresources of a blocked type; let everything else through."""
+    try:
+        if req.resourceType in SCREENSHOT_BLOCK_RESOURCES:
+            await req.abort()
+        else:
+            await req.continue_()
+    except Exception as e:
+        logger.debug(f'[BROWSER] Request interception failed: {e}')
+
+
+def _on_request(req):
+    """Schedule _filter_request for an intercepted request, holding on to its task."""
+    task = asyncio.ensure_future(_filter_request(req))
+    _filter_tasks.add(task)
+    task.add_done_callback(_filter_tasks.discard)
+
 
 async def _ensure_browser(width: int, height: int):
     """Ensure browser instance is running. Returns (browser, page)."""
-    global _browser, _page
-    
-    # Check if browser is still connected
-    if _browser is not None:
-        try:
-            # Test if browser is still alive
-            await _browser.version()
-        except Exception:
-            logger.debug('[BROWSER] Browser connection lost, relaunching...')
-            _browser = None
-            _page = None
-    
+    global _browser, _page, _cdp, _page_viewport, _page_headers, _page_url, _zoom_applied
+
+    # A lost browser is cleared by the 'disconnected' event, so no liveness
+    # round-trip is needed before each render
     if _browser is None:
         logger.debug('[BROWSER] Launching persistent browser instance...')
         executable_candidates = ['/usr/bin/chromium-browser', '/usr/bin/chromium']
@@ -279,32 +552,64 @@ async def _ensure_browser(width: int, height: int):
                 executable_path = cand
                 break
         
+        launch_kwargs = {
+            'headless': True,
+            'args': LAUNCH_ARGS,
+            # Shutdown is handled by async_main, not pyppeteer's signal hooks
+            'handleSIGINT': False,
+            'handleSIGTERM': False,
+            'handleSIGHUP': False,
+        }
+        if executable_path:
+            launch_kwargs['executablePath'] = executable_path
         try:
-            if executable_path:
-                _browser = await pyppeteer.launch(headless=True, executablePath=executable_path)
-            else:
-                _browser = await pyppeteer.launch(headless=True)
+            _browser = await pyppeteer.launch(**launch_kwargs)
         except Exception:
-            args = ['--no-sandbox']
-            if executable_path:
-                _browser = await pyppeteer.launch(headless=True, executablePath=executable_path, args=args)
-            else:
-                _browser = await pyppeteer.launch(headless=True, args=args)
+            launch_kwargs['args'] = LAUNCH_ARGS + ['--no-sandbox']
+            _browser = await pyppeteer.launch(**launch_kwargs)
         
+        browser = _browser
+        browser.on('disconnected', lambda: _on_browser_disconnected(browser))
         logger.debug('[BROWSER] ✓ Browser launched successfully')
         _page = None  # Force new page creation
     
     if _page is None:
         logger.debug('[BROWSER] Creating new page...')
         _page = await _browser.newPage()
-        await _page.setViewport({'width': width, 'height': height})
+        _page_viewport = None
+        _page_headers = None
+        _page_url = None
+        _zoom_applied = None
+        # Any main-frame navigation, including the page reloading itself,
+        # replaces the document and drops the applied zoom
+        _page.on('framenavigated', _on_frame_navigated)
+        if SCREENSHOT_BLOCK_RESOURCES:
+            # Interception also bypasses the browser cache, so it's opt-in
+            await _page.setRequestInterception(True)
+            _page.on('request', _on_request)
+        # Long-lived DevTools channel for capturing screenshots directly
+        _cdp = await _page.target.createCDPSession()
         logger.debug('[BROWSER] ✓ Page created')
-    
+
+    if _page_viewport != (width, height):
+        await _page.setViewport({'width': width, 'height': height})
+        _page_viewport = (width, height)
+
     return _browser, _page
 
 
+async def _warm_browser():
+    """Launch the browser and its page ahead of the first render."""
+    try:
+        async with _page_lock:
+            await _ensure_browser(SCREENSHOT_WIDTH, SCREENSHOT_HEIGHT)
+        logger.debug('[STARTUP] Browser ready')
+    except Exception as e:
+        logger.debug(f'[STARTUP] Browser warm-up failed; will launch on first render: {e}')
+
+
 async def render_url_with_pyppeteer(url: str, headers: dict | None = None, timeout: int = 30000, width: int = 1920, height: int = 1080, zoom: int = 100, skip_navigation: bool = False):
-    """Render the given URL to a PNG using pyppeteer and return bytes.
+    """Render the given URL to a JPEG using pyppeteer and return bytes.
 
     Args:
         zoom: Zoom percentage (100 = 100%, 150 = 150%, 50 = 50%)
@@ -312,46 +617,83 @@ async def render_url_with_pyppeteer(url: str, headers: dict | None = None, timeo
 
     Uses persistent browser instance for faster subsequent renders.
     """
+    global _page, _page_url, _page_headers, _zoom_applied
     async with _page_lock:
         browser, page = await _ensure_browser(width, height)
-        
-        # Set extra headers if provided (only on first load or when navigation isn't skipped)
-        if headers and not skip_navigation:
-            await page.setExtraHTTPHeaders(headers)
-        
-        # Navigate to URL - use 'networkidle2' to wait for most network activity to complete
-        # This waits until there are ≤2 network connections for 500ms (ideal for dynamic content)
-        if not skip_navigation:
-            logger.debug('[BROWSER] Navigating to URL...')
-            await page.goto(url, {'waitUntil': 'networkidle2', 'timeout': timeout})
+        # A fresh page has nothing loaded yet, so it must navigate even when
+        # skip_navigation is set
+        navigate = not skip_navigation or _page_url != url
+        try:
+            # Set extra headers if provided; they stick to the page, so only send
+            # them when the page is new or they changed
+            if headers and navigate and headers != _page_headers:
+                await page.setExtraHTTPHeaders(dict(headers))
+                _page_headers = dict(headers)
             
-            # Optional additional wait after network idle (configurable via SCREENSHOT_WAIT)
-            if SCREENSHOT_WAIT > 0:
-                await asyncio.sleep(SCREENSHOT_WAIT)
-        else:
-            logger.debug('[BROWSER] Skipping navigation (page auto-refreshes), taking new screenshot...')
-            # Still wait a moment for any auto-refresh content to settle
-            if SCREENSHOT_WAIT > 0:
-                await asyncio.sleep(SCREENSHOT_WAIT)
-        
-        # Apply zoom by scaling the page
-        if zoom != 100:
-            await page.evaluate(f'() => {{ document.body.style.zoom = "{zoom}%" }}')
-        
-        # Take screenshot
-        logger.debug('[BROWSER] Taking screenshot...')
-        screenshot = await page.screenshot({'fullPage': False})
-        logger.debug('[BROWSER] ✓ Screenshot captured')
+            # Navigate to URL - the default 'networkidle2' waits until there are ≤2
+            # network connections for 500ms (ideal for dynamic content). Pages that
+            # never go idle (analytics beacons, long polling) render much sooner
+            # with 'domcontentloaded' plus a selector for the content that matters.
+            if navigate:
+                wait_options = {'waitUntil': SCREENSHOT_WAIT_UNTIL, 'timeout': timeout}
+                if _page_url == url:
+                    # Same document again: a reload keeps the renderer and its
+                    # connections instead of setting up a fresh navigation
+                    logger.debug('[BROWSER] Reloading page...')
+                    await page.reload(wait_options)
+                else:
+                    logger.debug('[BROWSER] Navigating to URL...')
+                    await page.goto(url, wait_options)
+                    _page_url = url
+                if SCREENSHOT_WAIT_SELECTOR:
+                    try:
+                        await page.waitForSelector(SCREENSHOT_WAIT_SELECTOR, {'timeout': 5000, 'visible': True})
+                    except Exception as e:
+                        logger.warning(f'[BROWSER] Selector {SCREENSHOT_WAIT_SELECTOR!r} not found, capturing anyway: {e}')
+                
+                # Optional additional wait after network idle (configurable via SCREENSHOT_WAIT)
+                if SCREENSHOT_WAIT > 0:
+                    await asyncio.sleep(SCREENSHOT_WAIT)
+            else:
+                logger.debug('[BROWSER] Skipping navigation (page auto-refreshes), taking new screenshot...')
+                # Still wait a moment for any auto-refresh content to settle
+                if SCREENSHOT_WAIT > 0:
+                    await asyncio.sleep(SCREENSHOT_WAIT)
+            
+            # Apply zoom by scaling the page; the style persists until the next
+            # navigation, so skip_navigation cycles don't need to set it again
+            if zoom != 100 and _zoom_applied != zoom:
+                await page.evaluate(f'() => {{ document.body.style.zoom = "{zoom}%" }}')
+                _zoom_applied = zoom
+            
+            # Take screenshot as JPEG (cheaper to encode than PNG, several times
+            # smaller, and matches ART_PATH / the TV upload type). Ask DevTools for
+            # the viewport directly; page.screenshot() adds a target-activation
+            # round-trip per call that a single headless page doesn't need.
+            logger.debug('[BROWSER] Taking screenshot...')
+            result = await _cdp.send('Page.captureScreenshot', CAPTURE_PARAMS)
+            screenshot = base64.b64decode(result['data'])
+            logger.debug('[BROWSER] ✓ Screenshot captured')
+        except Exception:
+            # The page may be stuck mid-navigation; start the next render on a
+            # fresh one rather than reusing it
+            if _page is page:
+                _page = None
+                with contextlib.suppress(Exception):
+                    await asyncio.wait_for(page.close(), timeout=5)
+            raise
         
         return screenshot
 
 
 def _on_mqtt_connect(client, userdata, flags, rc):
     """MQTT connect callback."""
-    global _mqtt_connected, _main_loop
+    global _mqtt_connected, _mqtt_last_state
     if rc == 0:
         logger.info('[MQTT] ✓ Connected to MQTT broker')
         _mqtt_connected = True
+        # The broker may have lost retained state; publish everything again
+        _mqtt_last_state = None
         # Publish discovery messages for sensors
         try:
             if _main_loop:
@@ -373,84 +715,90 @@ def _on_mqtt_disconnect(client, userdata, rc):
         logger.warning(f'[MQTT] Unexpected disconnection with code {rc}')
 
 
-async def _mqtt_publish_discovery():
-    """Publish Home Assistant MQTT Discovery messages for sensors."""
-    global _mqtt_client
-    if not _mqtt_client or not _mqtt_connected:
-        logger.warning('[MQTT] Cannot publish discovery: client not connected')
-        return
-    
-    try:
-        device_id = 'screenshot_frame'
-        device_info = {
-            'identifiers': ['screenshot_to_samsung_frame_addon'],
-            'name': 'Screenshot to Samsung Frame',
-            'manufacturer': 'Home Assistant Community',
-            'model': 'Screenshot Frame Add-on',
-        }
-        
-        # Discovery message for last_sync sensor
-        discovery_topic = f'{MQTT_TOPIC_BASE}/sensor/{device_id}/last_sync/config'
-        discovery_payload = {
+# All status sensors read from this one retained JSON topic
+MQTT_STATE_TOPIC = 'screenshot_frame/state'
+
+
+def _build_mqtt_discovery():
+    """Return (topic, encoded payload) pairs for the Home Assistant discovery messages."""
+    device_id = 'screenshot_frame'
+    device_info = {
+        'identifiers': ['screenshot_to_samsung_frame_addon'],
+        'name': 'Screenshot to Samsung Frame',
+        'manufacturer': 'Home Assistant Community',
+        'model': 'Screenshot Frame Add-on',
+    }
+    sensors = [
+        # (component, key, extra config)
+        ('sensor', 'last_sync', {
             'name': 'Screenshot Frame Last Sync',
-            'unique_id': f'{device_id}_last_sync',
-            'state_topic': f'screenshot_frame/last_sync',
+            'value_template': '{{ value_json.last_sync }}',
             'device_class': 'timestamp',
-            'device': device_info,
-        }
-        _mqtt_client.publish(discovery_topic, json.dumps(discovery_payload), retain=True)
-        logger.info(f'[MQTT] Published discovery for last_sync')
-        
-        # Discovery message for success sensor
-        discovery_topic = f'{MQTT_TOPIC_BASE}/binary_sensor/{device_id}/success/config'
-        discovery_payload = {
+        }),
+        ('binary_sensor', 'success', {
             'name': 'Screenshot Frame Sync Success',
-            'unique_id': f'{device_id}_success',
-            'state_topic': f'screenshot_frame/success',
+            'value_template': "{{ 'ON' if value_json.success else 'OFF' }}",
             'device_class': 'connectivity',
-            'device': device_info,
-        }
-        _mqtt_client.publish(discovery_topic, json.dumps(discovery_payload), retain=True)
-        logger.info(f'[MQTT] Published discovery for success')
-        
-        # Discovery message for error sensor
-        discovery_topic = f'{MQTT_TOPIC_BASE}/sensor/{device_id}/error/config'
-        discovery_payload = {
+        }),
+        ('sensor', 'error', {
             'name': 'Screenshot Frame Last Error',
-            'unique_id': f'{device_id}_error',
-            'state_topic': f'screenshot_frame/error',
+            'value_template': '{{ value_json.error }}',
+        }),
+    ]
+    messages = []
+    for component, key, config in sensors:
+        payload = {
+            'unique_id': f'{device_id}_{key}',
+            'state_topic': MQTT_STATE_TOPIC,
             'device': device_info,
+            **config,
         }
-        _mqtt_client.publish(discovery_topic, json.dumps(discovery_payload), retain=True)
-        logger.info(f'[MQTT] Published discovery for error')
+        messages.append((f'{MQTT_TOPIC_BASE}/{component}/{device_id}/{key}/config', key, json.dumps(payload)))
+    return messages
+
+
+# Discovery payloads never change, so they are encoded once and reused on reconnect
+_mqtt_discovery = _build_mqtt_discovery()
+
+
+async def _mqtt_publish_discovery():
+    """Publish Home Assistant MQTT Discovery messages for sensors."""
+    if not _mqtt_client or not _mqtt_connected:
+        logger.warning('[MQTT] Cannot publish discovery: client not connected')
+        return
+    
+    try:
+        for topic, key, payload in _mqtt_discovery:
+            _mqtt_client.publish(topic, payload, retain=True)
+            logger.info(f'[MQTT] Published discovery for {key}')
     except Exception as e:
         logger.error(f'[MQTT] Error publishing discovery: {e}')
 
 
 async def _mqtt_update_status():
     """Publish current status to MQTT."""
-    global _mqtt_client, _mqtt_connected, _last_sync_time, _last_sync_success, _last_error
-    
+    global _mqtt_last_state
     if not MQTT_ENABLED or not _mqtt_client or not _mqtt_connected:
         logger.debug('[MQTT] Cannot update status: MQTT not enabled or not connected')
         return
     
     async with _status_lock:
         try:
-            # Publish last_sync timestamp
-            if _last_sync_time:
-                _mqtt_client.publish('screenshot_frame/last_sync', _last_sync_time.isoformat(), retain=True)
-                logger.info(f'[MQTT] Published last_sync: {_last_sync_time.isoformat()}')
-            
-            # Publish success status as ON/OFF
-            state = 'ON' if _last_sync_success else 'OFF'
-            _mqtt_client.publish('screenshot_frame/success', state, retain=True)
-            logger.info(f'[MQTT] Published success: {state}')
-            
-            # Publish error message (empty if no error)
-            error_msg = _last_error if _last_error else 'None'
-            _mqtt_client.publish('screenshot_frame/error', error_msg, retain=True)
-            logger.info(f'[MQTT] Published error: {error_msg}')
+            # One retained message carries every sensor's state
+            state = {
+                'last_sync': _last_sync_time.isoformat() if _last_sync_time else None,
+                'success': _last_sync_success,
+                'error': _last_error,
+            }
+            payload = json.dumps(state)
+            # last_sync moves on every success, so only a failure with the
+            # same error as the last update can repeat the retained state
+            if not _last_sync_success and payload == _mqtt_last_state:
+                logger.debug('[MQTT] Same failure as last update; not republishing')
+                return
+            _mqtt_client.publish(MQTT_STATE_TOPIC, payload, qos=0, retain=True)
+            _mqtt_last_state = payload
+            logger.info(f'[MQTT] Published status update (success={_last_sync_success})')
             
         except Exception as e:
             logger.error(f'[MQTT] Error publishing status: {e}')
@@ -458,7 +806,7 @@ async def _mqtt_update_status():
 
 async def _mqtt_connect():
     """Initialize and connect MQTT client."""
-    global _mqtt_client, _mqtt_connected
+    global _mqtt_client
     
     if not MQTT_ENABLED:
         logger.info('[MQTT] MQTT integration is disabled')
@@ -487,9 +835,7 @@ async def _mqtt_connect():
             logger.warning('[MQTT] MQTT client started but not yet connected')
         
     except Exception as e:
-        logger.error(f'[MQTT] Failed to initialize MQTT: {e}')
-        import traceback
-        traceback.print_exc()
+        logger.exception(f'[MQTT] Failed to initialize MQTT: {e}')
         _mqtt_client = None
 
 
@@ -497,16 +843,306 @@ async def _mqtt_disconnect():
     """Disconnect MQTT client."""
     global _mqtt_client, _mqtt_connected
     
-    if _mqtt_client:
+    client, _mqtt_client = _mqtt_client, None
+    _mqtt_connected = False
+    if client:
+        def _stop():
+            with contextlib.suppress(Exception):
+                client.loop_stop()
+                client.disconnect()
+
+        # Joining paho's network thread blocks; keep it off the event loop so
+        # the other teardown steps overlap with it and it can be timed out
+        await asyncio.to_thread(_stop)
+
+
+def _load_target_validators() -> dict:
+    """Load cached ETag/Last-Modified validators for the target URL."""
+    try:
+        with open(TARGET_CACHE_FILE, 'r') as f:
+            cached = json.load(f)
+        # Validators only apply to the URL they were recorded for
+        if isinstance(cached, dict) and cached.get('url') == TARGET_URL:
+            return cached
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.debug(f'[LOOP] Could not read target cache: {e}')
+    return {}
+
+
+def _save_target_validators(validators: dict):
+    """Persist ETag/Last-Modified validators so restarts can keep using them."""
+    try:
+        with open(TARGET_CACHE_FILE, 'w') as f:
+            json.dump(validators, f)
+    except Exception as e:
+        logger.debug(f'[LOOP] Could not write target cache: {e}')
+
+
+def _write_art(data: bytes) -> str:
+    """Atomically replace ART_PATH so readers never see a partially written file.
+
+    Returns the content hash of the new art.
+    """
+    global _art_cache
+    tmp = ART_PATH.with_suffix(ART_PATH.suffix + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, ART_PATH)
+    digest = _art_digest(data)
+    _art_cache = (digest, data)
+    return digest
+
+
+async def _stream_art(first: bytes, resp) -> str:
+    """Stream an image response into ART_PATH and return its content hash.
+
+    Only one chunk is held in memory at a time; the file is swapped in atomically.
+    """
+    global _art_cache
+    digest = hashlib.blake2b(digest_size=16)
+    tmp = ART_PATH.with_suffix(ART_PATH.suffix + '.tmp')
+    # Disk writes run in a worker thread so slow storage doesn't stall the loop
+    f = await asyncio.to_thread(open, tmp, 'wb')
+    try:
         try:
-            _mqtt_client.loop_stop()
-            _mqtt_client.disconnect()
-            logger.debug('[MQTT] Disconnected')
-        except Exception:
-            pass
+            await asyncio.to_thread(f.write, first)
+            digest.update(first)
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                await asyncio.to_thread(f.write, chunk)
+                digest.update(chunk)
         finally:
-            _mqtt_client = None
-            _mqtt_connected = False
+            await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.replace, tmp, ART_PATH)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    # Streamed art is not kept in memory; /screenshot reads it on first request
+    _art_cache = (digest.hexdigest(), None)
+    return _art_cache[0]
+
+
+def _art_digest(data: bytes) -> str:
+    """Return a short content hash used to detect unchanged art."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _read_current_art():
+    """Read and hash the art already in ART_PATH, caching it for /screenshot.
+
+    Returns (digest, bytes).
+    """
+    global _art_cache
+    data = ART_PATH.read_bytes()
+    _art_cache = (_art_digest(data), data)
+    return _art_cache
+
+
+def _current_art_digest() -> str:
+    """Hash the art already in ART_PATH and cache it for /screenshot."""
+    return _read_current_art()[0]
+
+
+def _load_last_art_hash():
+    """Return the hash of the last art uploaded to the TV, if known."""
+    try:
+        with open(TV_LAST_HASH_FILE, 'r') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f'[LOOP] Could not read last art hash: {e}')
+        return None
+
+
+def _save_last_art_hash(digest: str):
+    """Persist the hash of the art just uploaded so restarts don't re-upload it."""
+    try:
+        _write_text_atomic(TV_LAST_HASH_FILE, digest)
+    except Exception as e:
+        logger.warning(f'[LOOP] Warning: Failed to cache art hash: {e}')
+
+
+async def _with_retry(coro_factory, label: str, attempts: int = 3):
+    """Await coro_factory() up to `attempts` times with exponential backoff (1s, 2s, ...)."""
+    for attempt in range(attempts):
+        try:
+            return await coro_factory()
+        except Exception as e:
+            if attempt == attempts - 1:
+                raise
+            delay = 2 ** attempt
+            logger.warning(f'[RETRY] {label} failed (attempt {attempt + 1}/{attempts}): {e}; retrying in {delay}s')
+            await asyncio.sleep(delay)
+
+
+async def _render_target(skip_navigation: bool, fallback: bytes | None = None):
+    """Render TARGET_URL with pyppeteer, save it to ART_PATH and return its hash."""
+    rendered = await render_url_with_pyppeteer(TARGET_URL, headers=_TARGET_HEADERS, width=SCREENSHOT_WIDTH, height=SCREENSHOT_HEIGHT, zoom=SCREENSHOT_ZOOM, skip_navigation=skip_navigation)
+    if rendered:
+        art_digest = await asyncio.to_thread(_write_art, rendered)
+        logger.debug(f'Saved pyppeteer-rendered image to {ART_PATH}')
+        return art_digest
+    if fallback is not None:
+        # Fallback: save the raw response (likely HTML) for debugging
+        art_digest = await asyncio.to_thread(_write_art, fallback)
+        logger.warning(f'pyppeteer not available or failed; saved raw target response to {ART_PATH}')
+        return art_digest
+    logger.warning('pyppeteer render returned no image; keeping current art')
+    return None
+
+
+async def _fetch_target(validators: dict, skip_navigation: bool):
+    """Fetch TARGET_URL once and save the resulting art to ART_PATH.
+
+    Returns (unchanged, art_digest, validators): whether the target answered
+    304 for the current art, the hash of the art now in ART_PATH (if known),
+    and the conditional-GET validators to use for the next fetch.
+    """
+    global _target_is_html
+    unchanged = False
+    art_digest = None
+    if _target_is_html:
+        # The browser fetches the page itself; probing it again is wasted work
+        logger.debug('Target is HTML; rendering without probe fetch')
+        return unchanged, await _render_target(skip_navigation), validators
+    logger.debug(f'Fetching from target URL: {TARGET_URL} (auth={TARGET_AUTH_TYPE})')
+    request_headers = dict(_TARGET_HEADERS)
+    if validators.get('etag'):
+        request_headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        request_headers['If-Modified-Since'] = validators['last_modified']
+    async with _http_session.get(TARGET_URL, headers=request_headers or None, auth=_TARGET_AUTH) as resp:
+        if resp.status == 304 and ART_PATH.exists():
+            logger.debug('Target image not modified (304); keeping current art')
+            unchanged = True
+            # The caller still needs the hash to tell whether this art ever
+            # made it to the TV
+            art_digest = _art_cache[0] or await asyncio.to_thread(_current_art_digest)
+        elif resp.status == 200:
+            ctype = (resp.headers.get('content-type') or '').lower()
+            # Sniff the first chunk instead of buffering the whole body
+            first = await resp.content.readany()
+            # If the target returns HTML, render it with pyppeteer
+            if ctype.startswith('text/html') or first.lstrip().startswith(b'<'):
+                logger.debug('Target returned HTML; attempting pyppeteer render')
+                content = first + await resp.content.read()
+                # Rendered pages change without the HTML changing, so
+                # never revalidate them with conditional requests
+                if validators:
+                    validators = {}
+                    await asyncio.to_thread(_save_target_validators, validators)
+                art_digest = await _render_target(skip_navigation, fallback=content)
+                _target_is_html = True
+            else:
+                art_digest = await _stream_art(first, resp)
+                logger.debug(f'Saved image from target to {ART_PATH}')
+                new_validators = {
+                    'url': TARGET_URL,
+                    'etag': resp.headers.get('ETag'),
+                    'last_modified': resp.headers.get('Last-Modified'),
+                }
+                if new_validators != validators:
+                    validators = new_validators
+                    await asyncio.to_thread(_save_target_validators, validators)
+        elif resp.status == 304:
+            # Nothing local to keep; force a full fetch next cycle
+            logger.warning('Target returned 304 but no local art exists; clearing cached validators')
+            validators = {}
+            await asyncio.to_thread(_save_target_validators, validators)
+        else:
+            logger.warning(f'Target URL returned status {resp.status}')
+    return unchanged, art_digest, validators
+
+
+async def _run_cycle(loop_count: int, validators: dict) -> dict:
+    """Fetch the target once and hand new art to the TV. Returns the updated validators."""
+    global _last_sync_time, _last_sync_success, _last_error
+    unchanged = False
+    art_digest = None
+    fetch_failed = False
+    try:
+        if not TARGET_URL:
+            logger.debug('[LOOP] Skipping fetch; TARGET_URL not set')
+        else:
+            try:
+                # Skip navigation after first load if configured (for auto-refreshing pages)
+                skip_nav = SCREENSHOT_SKIP_NAVIGATION and loop_count > 1
+                unchanged, art_digest, validators = await _with_retry(
+                    lambda: _fetch_target(validators, skip_nav), 'Target fetch'
+                )
+            except Exception as e:
+                fetch_failed = True
+                logger.error(f'Error fetching from target URL: {e}')
+                async with _status_lock:
+                    _last_error = str(e)
+    except Exception as e:
+        fetch_failed = True
+        logger.error(f'Fetch loop error: {e}')
+        async with _status_lock:
+            _last_error = str(e)
+
+    if fetch_failed:
+        # The art on disk hasn't changed, so there is nothing to upload, and
+        # the error stays visible until a fetch succeeds
+        return validators
+    if TV_IP and not art_digest:
+        # Nothing new was saved; the art already on disk (if any) is still
+        # held to the same check as fresh art
+        if not ART_PATH.exists():
+            logger.debug('[LOOP] No art available yet; skipping TV upload')
+            return validators
+        art_digest = _art_cache[0] or await asyncio.to_thread(_current_art_digest)
+
+    # Identical bytes are already on the TV; the upload is the slowest step.
+    # A 304 only says the target didn't change, not that the last upload of
+    # that art succeeded, so it is held to the same check. Art queued or in
+    # flight counts too: it is what the TV shows once the worker is done.
+    handed_off = False
+    if TV_IP and art_digest:
+        pending = _upload_queue.get_nowait() if _upload_queue.full() else None
+        ahead = pending or _inflight_art_hash
+        if ahead is not None and art_digest == ahead:
+            # The worker already has this art; it reports the outcome
+            handed_off = True
+            if pending is not None:
+                _upload_queue.put_nowait(pending)
+        else:
+            # Pending art older than the current art is dropped either way
+            unchanged = art_digest == _last_art_hash and _inflight_art_hash is None
+            if pending is not None:
+                logger.debug('[LOOP] Dropping art still waiting for upload; it is no longer current')
+
+    if handed_off:
+        logger.debug('[LOOP] Art already handed to the upload worker')
+    elif unchanged:
+        logger.debug('[LOOP] Art unchanged since last cycle; skipping TV upload')
+        async with _status_lock:
+            _last_sync_time = datetime.now()
+            _last_sync_success = True
+            _last_error = None
+        await _mqtt_update_status()
+    elif TV_IP:
+        # Hand the art to the upload worker so the next fetch isn't blocked
+        # on the TV; only the freshest frame is worth uploading
+        if _upload_queue.full():
+            _upload_queue.get_nowait()
+        _upload_queue.put_nowait(art_digest)
+    else:
+        logger.debug('[LOOP] TV upload disabled (use_local_tv=false or tv_ip not set)')
+        # Still mark as success if just fetching (no TV upload)
+        if TARGET_URL:
+            async with _status_lock:
+                _last_sync_time = datetime.now()
+                _last_sync_success = True
+                _last_error = None
+            await _mqtt_update_status()
+
+    return validators
 
 
 async def screenshot_loop():
@@ -514,121 +1150,30 @@ async def screenshot_loop():
     if not TARGET_URL:
         logger.warning('[LOOP] WARNING: No TARGET_URL configured; the add-on will not fetch screenshots')
 
-    global _last_sync_time, _last_sync_success, _last_error
+    global _last_art_hash
+    loop = asyncio.get_running_loop()
     loop_count = 0
-    next_cycle_time = None
-    
+    # Fixed cadence: each cycle is due INTERVAL after the previous one was due
+    next_cycle_time = loop.time()
+
+    # Conditional GET state: lets image targets answer 304 when nothing changed
+    validators = _load_target_validators()
+    # Hash of the art currently on the TV, used to skip identical re-uploads
+    _last_art_hash = _load_last_art_hash()
+
+    # Cycles run back to back in this task rather than from loop.call_later()
+    # callbacks: a slow render must delay the next cycle, never overlap it
     while True:
         loop_count += 1
-        cycle_start = asyncio.get_event_loop().time()
+        cycle_start = loop.time()
         logger.debug(f'\n[LOOP] ===== Cycle #{loop_count} started =====')
-        try:
-            if not TARGET_URL:
-                logger.debug('[LOOP] Skipping fetch; TARGET_URL not set')
-            else:
-                try:
-                    # Build headers/auth dynamically so the target URL can be
-                    # Home Assistant (token header), DakBoard (basic auth), or
-                    # any other URL requiring custom headers.
-                    headers = {}
-                    auth = None
-                    if TARGET_HEADERS:
-                        try:
-                            parsed = json.loads(TARGET_HEADERS)
-                            if isinstance(parsed, dict):
-                                headers.update(parsed)
-                        except Exception:
-                            logger.warning('Failed to parse TARGET_HEADERS; expecting JSON map')
-
-                    if TARGET_AUTH_TYPE == 'bearer' and TARGET_TOKEN:
-                        headers[TARGET_TOKEN_HEADER] = f"{TARGET_TOKEN_PREFIX} {TARGET_TOKEN}"
-                    elif TARGET_AUTH_TYPE == 'basic' and TARGET_USERNAME and TARGET_PASSWORD:
-                        auth = BasicAuth(TARGET_USERNAME, TARGET_PASSWORD)
-
-                    async with ClientSession() as session:
-                        logger.debug(f'Fetching from target URL: {TARGET_URL} (auth={TARGET_AUTH_TYPE})')
-                        async with session.get(TARGET_URL, timeout=30, headers=headers or None, auth=auth) as resp:
-                            if resp.status == 200:
-                                ctype = (resp.headers.get('content-type') or '').lower()
-                                content = await resp.read()
-                                # If the target returns HTML, render it with pyppeteer
-                                if ctype.startswith('text/html') or (len(content) > 0 and content.lstrip().startswith(b'<')):
-                                    logger.debug('Target returned HTML; attempting pyppeteer render')
-                                    # Skip navigation after first load if configured (for auto-refreshing pages)
-                                    skip_nav = SCREENSHOT_SKIP_NAVIGATION and loop_count > 1
-                                    rendered = await render_url_with_pyppeteer(TARGET_URL, headers=headers, width=SCREENSHOT_WIDTH, height=SCREENSHOT_HEIGHT, zoom=SCREENSHOT_ZOOM, skip_navigation=skip_nav)
-                                    if rendered:
-                                        with open(str(ART_PATH), 'wb') as f:
-                                            f.write(rendered)
-                                        logger.debug(f'Saved pyppeteer-rendered image to {ART_PATH}')
-                                    else:
-                                        # Fallback: save the raw response (likely HTML) for debugging
-                                        with open(str(ART_PATH), 'wb') as f:
-                                            f.write(content)
-                                        logger.warning(f'pyppeteer not available or failed; saved raw target response to {ART_PATH}')
-                                else:
-                                    with open(str(ART_PATH), 'wb') as f:
-                                        f.write(content)
-                                    logger.debug(f'Saved image from target to {ART_PATH}')
-                            else:
-                                logger.warning(f'Target URL returned status {resp.status}')
-                except Exception as e:
-                    logger.error(f'Error fetching from target URL: {e}')
-                    async with _status_lock:
-                        _last_error = str(e)
-        except Exception as e:
-            logger.error(f'Fetch loop error: {e}')
-            async with _status_lock:
-                _last_error = str(e)
+        validators = await _run_cycle(loop_count, validators)
 
-        if TV_IP:
-            logger.debug(f'[LOOP] TV upload enabled, uploading to {TV_IP}:{TV_PORT}')
-            try:
-                content_id = await upload_image_to_tv_async(TV_IP, TV_PORT, str(ART_PATH), TV_MATTE, TV_SHOW_AFTER_UPLOAD)
-                if not content_id:
-                    logger.warning('[LOOP] WARNING: Async upload returned no id; upload may have failed')
-                    async with _status_lock:
-                        _last_sync_success = False
-                        _last_error = 'Upload returned no ID'
-                else:
-                    logger.debug(f'[LOOP] ✓ Upload complete with id: {content_id}')
-                    async with _status_lock:
-                        _last_sync_time = datetime.now()
-                        _last_sync_success = True
-                        _last_error = None
-                    await _mqtt_update_status()
-            except Exception as e:
-                logger.error(f'[LOOP] ERROR: Local TV upload error: {e}')
-                import traceback
-                traceback.print_exc()
-                async with _status_lock:
-                    _last_sync_success = False
-                    _last_error = str(e)
-                await _mqtt_update_status()
-        else:
-            logger.debug('[LOOP] TV upload disabled (use_local_tv=false or tv_ip not set)')
-            # Still mark as success if just fetching (no TV upload)
-            if TARGET_URL:
-                async with _status_lock:
-                    _last_sync_time = datetime.now()
-                    _last_sync_success = True
-                    _last_error = None
-                await _mqtt_update_status()
-
-        # Calculate cycle duration and next cycle time
-        cycle_end = asyncio.get_event_loop().time()
-        cycle_duration = cycle_end - cycle_start
-        
-        # Calculate when next cycle should start (fixed interval from cycle start)
-        if next_cycle_time is None:
-            # First cycle: schedule next one from now
-            next_cycle_time = cycle_start + INTERVAL
-        else:
-            # Subsequent cycles: schedule from previous target time
-            next_cycle_time += INTERVAL
-        
-        # Calculate sleep time
-        current_time = asyncio.get_event_loop().time()
+        # Next cycle is due one INTERVAL after this one was due, so work time
+        # doesn't accumulate as drift
+        current_time = loop.time()
+        cycle_duration = current_time - cycle_start
+        next_cycle_time += INTERVAL
         sleep_time = next_cycle_time - current_time
         
         if sleep_time > 0:
@@ -643,10 +1188,70 @@ async def screenshot_loop():
             next_cycle_time = current_time
 
 
+class NoContentIdError(RuntimeError):
+    """The TV didn't return a content id, e.g. because it is off or unreachable."""
+
+
+async def _upload_art(image_data: bytes | None = None, digest: str | None = None):
+    """Upload the current art to the TV, raising if the TV did not return a content id."""
+    content_id = await upload_image_to_tv_async(TV_IP, TV_PORT, str(ART_PATH), TV_MATTE, TV_SHOW_AFTER_UPLOAD, image_data=image_data, digest=digest)
+    if not content_id:
+        raise NoContentIdError('Upload returned no ID')
+    return content_id
+
+
+async def tv_upload_loop():
+    """Upload art queued by screenshot_loop to the TV, one upload at a time."""
+    global _last_sync_time, _last_sync_success, _last_error, _last_art_hash, _inflight_art_hash
+    logger.debug('[LOOP] TV upload worker started')
+
+    while True:
+        art_digest = await _upload_queue.get()
+        # Rendered art is still in memory; otherwise read it back from disk.
+        # ART_PATH may hold newer art than was queued by then, so the digest
+        # recorded is always that of the bytes actually uploaded.
+        cached_digest, cached_data = _art_cache
+        if art_digest and cached_digest == art_digest and cached_data is not None:
+            image_data = cached_data
+        else:
+            try:
+                art_digest, image_data = await asyncio.to_thread(_read_current_art)
+            except OSError as e:
+                logger.warning(f'[LOOP] No art to upload: {e}')
+                continue
+        # An earlier queued upload may already have put these bytes on the TV
+        if art_digest == _last_art_hash:
+            logger.debug('[LOOP] Art already on TV; skipping upload')
+            continue
+
+        logger.debug(f'[LOOP] Uploading art to {TV_IP}:{TV_PORT}')
+        _inflight_art_hash = art_digest
+        try:
+            content_id = await _with_retry(lambda: _upload_art(image_data, art_digest), 'TV upload')
+            logger.debug(f'[LOOP] ✓ Upload complete with id: {content_id}')
+            _last_art_hash = art_digest
+            await asyncio.to_thread(_save_last_art_hash, art_digest)
+            async with _status_lock:
+                _last_sync_time = datetime.now()
+                _last_sync_success = True
+                _last_error = None
+            await _mqtt_update_status()
+        except Exception as e:
+            if isinstance(e, NoContentIdError):
+                # Expected while the TV is off; the cause is logged by the upload itself
+                logger.warning('[LOOP] WARNING: Async upload returned no id; upload may have failed')
+            else:
+                logger.exception(f'[LOOP] ERROR: Local TV upload error: {e}')
+            async with _status_lock:
+                _last_sync_success = False
+                _last_error = str(e)
+            await _mqtt_update_status()
+        finally:
+            _inflight_art_hash = None
+
+
 async def handle_status(request):
     """API endpoint: GET /status - Returns JSON with sync status and timestamp."""
-    global _last_sync_time, _last_sync_success, _last_error
-    
     async with _status_lock:
         return web.json_response({
             'last_sync': _last_sync_time.isoformat() if _last_sync_time else None,
@@ -656,15 +1261,32 @@ async def handle_status(request):
         })
 
 
+def _read_art_head() -> bytes:
+    """Return the first bytes of ART_PATH, enough to tell PNG from JPEG."""
+    with open(ART_PATH, 'rb') as f:
+        return f.read(8)
+
+
 async def handle_screenshot(request):
     """API endpoint: GET /screenshot - Returns current screenshot image."""
     try:
-        if ART_PATH.exists():
-            with open(str(ART_PATH), 'rb') as f:
-                data = f.read()
-            return web.Response(body=data, content_type='image/jpeg')
-        else:
-            return web.Response(status=404, text='Screenshot not yet available')
+        etag, data = _art_cache
+        # Pollers that already have the current image get an empty 304
+        if etag and request.if_none_match:
+            if any(e.value in (etag, '*') for e in request.if_none_match):
+                return web.Response(status=304, headers={'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'})
+        if data is None:
+            # Cold cache (streamed art or art from a previous run): let aiohttp
+            # sendfile() it instead of reading it into memory. FileResponse
+            # brings its own mtime/size ETag, Last-Modified and Range handling.
+            if not ART_PATH.exists():
+                return web.Response(status=404, text='Screenshot not yet available')
+            head = await asyncio.to_thread(_read_art_head)
+            content_type = 'image/png' if _image_type(head) == 'PNG' else 'image/jpeg'
+            return web.FileResponse(ART_PATH, headers={'Content-Type': content_type, 'Cache-Control': 'no-cache'})
+        content_type = 'image/png' if _image_type(data) == 'PNG' else 'image/jpeg'
+        return web.Response(body=data, content_type=content_type,
+                            headers={'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'})
     except Exception as e:
         logger.error(f'[API] Error serving screenshot: {e}')
         return web.Response(status=500, text=f'Error: {e}')
@@ -690,66 +1312,159 @@ async def start_api_server():
     return runner
 
 
+# Longest any single shutdown step may take before it is abandoned
+SHUTDOWN_TIMEOUT = 5.0  # seconds
+
+
+async def _close_browser(warm_task):
+    """Close the persistent browser once an unfinished warm-up has stopped."""
+    global _page
+    if warm_task and not warm_task.done():
+        warm_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await warm_task
+    # Browser.close takes its pages down with it; closing _page first would
+    # only add a DevTools round-trip
+    _page = None
+    if _browser:
+        try:
+            await _browser.close()
+        except asyncio.CancelledError:
+            # Shutdown timed out on a wedged Chromium; kill it rather than hold
+            # up the supervisor
+            if _browser.process:
+                _browser.process.kill()
+            raise
+
+
 async def async_main():
-    global _main_loop
+    global _main_loop, _http_session
     logger.debug('[STARTUP] Starting screenshot loop...')
 
     loop = asyncio.get_running_loop()
     _main_loop = loop  # Store for MQTT callbacks
-    
-    # Initialize MQTT if enabled
-    await _mqtt_connect()
-    
-    screenshot_task = loop.create_task(screenshot_loop())
-    api_runner = await start_api_server()
+
+    # The supervisor stops add-ons with SIGTERM; turn it (and Ctrl+C) into
+    # cancellation of this task so the cleanup below always runs
+    main_task = asyncio.current_task()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, main_task.cancel)
+
+    # Release steps for what has been acquired so far, registered right after
+    # each acquisition; the finally block runs whichever got registered, even
+    # if a later startup step fails
+    teardown = {}
+    warm_task = None
     try:
-        await asyncio.Event().wait()  # run indefinitely until cancelled/interrupt
+        # A target known to need rendering gets its browser launched while
+        # MQTT and the API server start, instead of inside the first cycle
+        if _target_is_html:
+            warm_task = asyncio.create_task(_warm_browser())
+        # The browser starts lazily on first render, so it is always registered
+        teardown['browser'] = lambda: _close_browser(warm_task)
+
+        # Initialize MQTT if enabled. Registered first: the network thread is
+        # already running while _mqtt_connect waits for the broker
+        teardown['mqtt'] = _mqtt_disconnect
+        await _mqtt_connect()
+
+        # One pooled session for the lifetime of the add-on so target fetches reuse
+        # keep-alive connections instead of handshaking every cycle. Idle
+        # connections must outlive the fetch interval to be reused at all, and
+        # resolved addresses are cached well beyond aiohttp's 10s default.
+        _http_session = ClientSession(
+            connector=TCPConnector(
+                limit=8,
+                limit_per_host=4,
+                ttl_dns_cache=300,
+                keepalive_timeout=max(INTERVAL * 2, 120),
+            ),
+            timeout=ClientTimeout(total=30, connect=10),
+        )
+        teardown['http'] = _http_session.close
+
+        api_runner = await start_api_server()
+        teardown['api'] = api_runner.cleanup
+
+        # Both loops run until cancelled/interrupted; one crashing ends the add-on
+        tasks = [asyncio.create_task(screenshot_loop())]
+        if TV_IP:
+            # Closed on the upload thread: it queues behind any upload still
+            # holding _tv_lock instead of racing it, and keeps the loop free
+            teardown['tv'] = lambda: loop.run_in_executor(_tv_executor, _close_tv_client)
+            tasks.append(asyncio.create_task(tv_upload_loop()))
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        finally:
+            # Stop both loops before releasing the resources they use, but don't
+            # let one stuck somewhere that ignores cancellation hold up shutdown
+            for task in tasks:
+                task.cancel()
+            _, pending = await asyncio.wait(tasks, timeout=SHUTDOWN_TIMEOUT)
+            if pending:
+                logger.warning('[SHUTDOWN] %d task(s) still running after %ss; continuing shutdown', len(pending), SHUTDOWN_TIMEOUT)
+    except asyncio.CancelledError:
+        logger.info('[SHUTDOWN] Stop requested')
     finally:
         logger.info('[SHUTDOWN] Shutting down gracefully...')
-        screenshot_task.cancel()
-        try:
-            await screenshot_task
-        except asyncio.CancelledError:
-            pass
-        
-        # Disconnect MQTT
-        await _mqtt_disconnect()
-        
-        # Clean up API server
-        try:
-            await api_runner.cleanup()
-            logger.debug('[SHUTDOWN] API server stopped')
-        except Exception:
-            pass
-        
-        # Clean up persistent browser
-        global _browser, _page
-        if _page:
-            try:
-                await _page.close()
-                logger.debug('[SHUTDOWN] Closed browser page')
-            except Exception:
-                pass
-        if _browser:
-            try:
-                await _browser.close()
-                logger.debug('[SHUTDOWN] Closed browser instance')
-            except Exception:
-                pass
-        
-        logger.debug('[SHUTDOWN] Cleanup complete')
+        started = time.perf_counter()
+
+        # The teardowns are independent, so run them concurrently:
+        # shutdown then takes as long as the slowest one, not their sum. Each
+        # step is bounded so a wedged subsystem can't stall shutdown.
+        results = await asyncio.gather(
+            *(asyncio.wait_for(release(), timeout=SHUTDOWN_TIMEOUT) for release in teardown.values()),
+            return_exceptions=True,
+        )
+        _tv_executor.shutdown(wait=False)
+        # One record for the whole teardown; raised to a warning when a step
+        # didn't finish cleanly so wedged subsystems stay visible
+        outcomes = []
+        for name, result in zip(teardown, results):
+            if isinstance(result, asyncio.TimeoutError):
+                outcomes.append(f'{name}=timeout')
+            elif isinstance(result, BaseException):
+                outcomes.append(f'{name}=failed({result!r})')
+            else:
+                outcomes.append(f'{name}=ok')
+        clean = not any(isinstance(result, BaseException) for result in results)
+        logger.log(logging.DEBUG if clean else logging.WARNING,
+                   '[SHUTDOWN] Cleanup complete in %.3fs: %s',
+                   time.perf_counter() - started, ' '.join(outcomes))
 
 
 def main():
     logger.debug('[MAIN] Starting addon...')
+    # Prefer uvloop's faster event loop when it is installed
     try:
-        asyncio.run(async_main())
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+        logger.debug('[MAIN] Using uvloop event loop')
+    except ImportError:
+        loop_factory = None
+    # FAST_EXIT=0 keeps the normal exit path for debugging
+    fast_exit = os.environ.get('FAST_EXIT', '1') == '1'
+    runner = asyncio.Runner(loop_factory=loop_factory)
+    try:
+        runner.run(async_main())
     except KeyboardInterrupt:
         logger.info('[MAIN] Received keyboard interrupt')
     except Exception as e:
-        logger.error(f'[MAIN] ERROR: Unexpected error: {e}')
-        import traceback
-        traceback.print_exc()
+        logger.exception('[MAIN] ERROR: Unexpected error: %s', e)
+    finally:
+        # Closing the runner cancels and waits for every leftover task; a task
+        # async_main already gave up on would block that forever, and with
+        # fast exit the process ends right below anyway
+        if not fast_exit:
+            runner.close()
+
+    # Cleanup has closed everything that owns a resource; skip the interpreter's
+    # finalization of the leftover pyppeteer/paho objects and threads
+    if fast_exit:
+        logging.shutdown()
+        os._exit(0)
 
 
 if __name__ == '__main__':
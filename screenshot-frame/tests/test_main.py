@@ -0,0 +1,86 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('aiohttp')
+pytest.importorskip('pyppeteer')
+pytest.importorskip('paho.mqtt')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import main  # noqa: E402
+
+
+class _FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.headers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeSession:
+    def __init__(self, status):
+        self.status = status
+
+    def get(self, url, **kwargs):
+        return _FakeResponse(self.status)
+
+
+@pytest.fixture
+def not_modified(monkeypatch, tmp_path):
+    """Art on disk, a target answering 304 and an empty upload queue."""
+    monkeypatch.setattr(main, 'TARGET_URL', 'http://target.local/art.jpg')
+    monkeypatch.setattr(main, 'TV_IP', '1.2.3.4')
+    monkeypatch.setattr(main, 'ART_PATH', tmp_path / 'art.jpg')
+    monkeypatch.setattr(main, '_target_is_html', False)
+    monkeypatch.setattr(main, '_http_session', _FakeSession(304))
+    monkeypatch.setattr(main, '_upload_queue', asyncio.Queue(maxsize=1))
+    monkeypatch.setattr(main, '_art_cache', (None, None))
+    digest = main._write_art(b'art bytes')
+    # Start from a cold cache so the 304 path has to hash ART_PATH
+    main._art_cache = (None, None)
+    return digest
+
+
+def test_304_requeues_art_after_failed_upload(monkeypatch, not_modified):
+    # The first upload failed, so the TV never got this art
+    monkeypatch.setattr(main, '_last_art_hash', None)
+    validators = {'url': main.TARGET_URL, 'etag': '"x"'}
+    asyncio.run(main._run_cycle(2, validators))
+    assert main._upload_queue.get_nowait() == not_modified
+
+
+def test_304_skips_upload_when_tv_has_art(monkeypatch, not_modified):
+    monkeypatch.setattr(main, '_last_art_hash', not_modified)
+    validators = {'url': main.TARGET_URL, 'etag': '"x"'}
+    asyncio.run(main._run_cycle(2, validators))
+    assert main._upload_queue.empty()
+
+
+def test_stale_queued_art_dropped_when_tv_has_current_art(monkeypatch, not_modified):
+    # Newer art was queued, then the target went back to what the TV shows
+    monkeypatch.setattr(main, '_last_art_hash', not_modified)
+    main._upload_queue.put_nowait('stale')
+    validators = {'url': main.TARGET_URL, 'etag': '"x"'}
+    asyncio.run(main._run_cycle(2, validators))
+    assert main._upload_queue.empty()
+
+
+def test_failed_fetch_leaves_queue_and_error(monkeypatch, not_modified):
+    async def failing_fetch(validators, skip_navigation):
+        raise OSError('target down')
+
+    monkeypatch.setattr(main, '_fetch_target', failing_fetch)
+    monkeypatch.setattr(main, '_with_retry', lambda factory, label: factory())
+    monkeypatch.setattr(main, '_last_art_hash', None)
+    monkeypatch.setattr(main, '_last_error', None)
+    main._upload_queue.put_nowait('pending')
+    asyncio.run(main._run_cycle(2, {}))
+    assert main._upload_queue.get_nowait() == 'pending'
+    assert main._last_error == 'target down'